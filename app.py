@@ -1,31 +1,14 @@
-from project_app import create_app, db
-from project_app.models import Admin
+from project_app import create_app
+from project_app.commands import create_db_and_seed_admin
+from project_app.events import record_spot_baseline
 import os
 
-app = create_app()
-
-def create_db_and_seed_admin():
-    with app.app_context():
-        # db.drop_all() # Comment this out to preserve data
-        db.create_all()
-        print("Database tables created.")
-
-        if not Admin.query.filter_by(email_id='admin@gmail.com').first():
-            admin_user = Admin(
-                email_id='admin@gmail.com',
-                fullname='System Administrator',
-                address='Admin HQ',
-                pin_code='110001'
-            )
-            admin_user.set_password('admin')
-            db.session.add(admin_user)
-            db.session.commit()
-            print("Predefined admin user created: admin@gmail.com / admin")
-        else:
-            print("Admin user already exists.")
-
+# Development server only. In production serve wsgi:app and run `flask --app wsgi init-db` once.
 if __name__ == '__main__':
-    if not os.path.exists(os.path.join(app.instance_path, 'site.db')):
-        os.makedirs(app.instance_path, exist_ok=True)
+    app = create_app()
+    # Safe to re-run on every start, so an existing site.db also gets tables added since it was created.
+    os.makedirs(app.instance_path, exist_ok=True)
+    with app.app_context():
         create_db_and_seed_admin()
-    app.run(debug=True)
\ No newline at end of file
+        record_spot_baseline()
+    app.run(debug=True)
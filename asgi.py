@@ -0,0 +1,7 @@
+# ASGI entry point, e.g. `uvicorn asgi:app`. Needs the packages in requirements-asgi.txt.
+# Read-heavy pages are served natively on an async SQLAlchemy engine; every other view
+# runs in the Flask app unchanged.
+from project_app import create_app
+from project_app.async_reads import to_asgi
+
+app = to_asgi(create_app())
@@ -0,0 +1,147 @@
+"""Compare requests/sec of the WSGI and ASGI serving modes under many concurrent clients.
+
+Both modes are served by a single uvicorn process with one a2wsgi thread pool of
+10 workers. In ASGI mode the read pages render on that same pool, so only the
+handling of the read pages differs:
+
+    wsgi: the Flask app behind a2wsgi        (every view sync on the thread pool)
+    asgi: to_asgi(create_app()) as in asgi.py (read pages natively on the async engine)
+
+The benchmark logs in once, then keeps --clients keep-alive connections busy
+requesting --path for --duration seconds in each mode. Run `flask --app wsgi
+init-db` first; the numbers depend on how much data is in the database.
+
+    python benchmarks/concurrency_benchmark.py --clients 500 --path /admin_dashboard
+"""
+import argparse
+import asyncio
+import http.client
+import os
+import resource
+import socket
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVER_APPS = {
+    'wsgi': 'WSGIMiddleware(create_app(), workers=10)',
+    'asgi': 'to_asgi(create_app(), workers=10)',
+}
+
+SERVER_SCRIPT = """
+import sys, uvicorn
+from a2wsgi import WSGIMiddleware
+from project_app import create_app
+from project_app.async_reads import to_asgi
+uvicorn.run({app}, port=int(sys.argv[1]), log_level='warning', backlog=int(sys.argv[2]))
+"""
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'Server did not start on port {port}')
+
+
+def login(port, email, password):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    body = f'email={email}&password={password}'
+    connection.request('POST', '/login', body=body, headers={'Content-Type': 'application/x-www-form-urlencoded'})
+    response = connection.getresponse()
+    response.read()
+    cookie = response.getheader('Set-Cookie')
+    if response.status != 302 or not cookie:
+        raise RuntimeError(f'Login as {email} failed (status {response.status})')
+    return cookie.split(';', 1)[0]
+
+
+async def client(port, request_bytes, deadline, stats):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            writer.write(request_bytes)
+            await writer.drain()
+
+            status_line = await reader.readline()
+            content_length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                if name.lower() == 'content-length':
+                    content_length = int(value)
+            await reader.readexactly(content_length)
+
+            if status_line.split()[1:2] == [b'200']:
+                stats['ok'] += 1
+                stats['latencies'].append(time.perf_counter() - started)
+            else:
+                stats['errors'] += 1
+    except (ConnectionError, asyncio.IncompleteReadError):
+        stats['errors'] += 1
+    finally:
+        writer.close()
+
+
+async def run_load(port, path, cookie, clients, duration):
+    request_bytes = (f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\nCookie: {cookie}\r\n\r\n').encode()
+    stats = {'ok': 0, 'errors': 0, 'latencies': []}
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(client(port, request_bytes, deadline, stats) for _ in range(clients)))
+    stats['elapsed'] = time.perf_counter() - started
+    return stats
+
+
+def benchmark_mode(mode, args):
+    server = subprocess.Popen(
+        [sys.executable, '-c', SERVER_SCRIPT.format(app=SERVER_APPS[mode]), str(args.port), str(max(2048, args.clients * 2))],
+        cwd=PROJECT_ROOT
+    )
+    try:
+        wait_for_port(args.port)
+        cookie = login(args.port, args.email, args.password)
+        # Warm up templates and connections before measuring.
+        asyncio.run(run_load(args.port, args.path, cookie, 10, 1))
+        stats = asyncio.run(run_load(args.port, args.path, cookie, args.clients, args.duration))
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies = sorted(stats['latencies']) or [0]
+    print(f"{mode}: {stats['ok'] / stats['elapsed']:8.1f} req/s  ok {stats['ok']:6d}  errors {stats['errors']:4d}  "
+          f"p50 {latencies[len(latencies) // 2] * 1000:7.1f} ms  p99 {latencies[int(len(latencies) * 0.99)] * 1000:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=500)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--path', default='/admin_dashboard')
+    parser.add_argument('--email', default='admin@gmail.com')
+    parser.add_argument('--password', default='admin')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--modes', nargs='+', default=['wsgi', 'asgi'], choices=sorted(SERVER_APPS))
+    args = parser.parse_args()
+
+    # Each client keeps a socket open on both ends of the connection.
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < args.clients * 2 + 100:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, args.clients * 2 + 100), hard))
+
+    print(f"{args.clients} concurrent clients, {args.duration:g}s per mode, GET {args.path}")
+    for mode in args.modes:
+        benchmark_mode(mode, args)
+
+
+if __name__ == '__main__':
+    main()
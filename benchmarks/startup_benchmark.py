@@ -0,0 +1,71 @@
+"""Measure time-to-first-request for a freshly started worker.
+
+Every run starts a new Python process (like a new gunicorn worker), imports
+wsgi.py and serves one request through the test client. The timings are
+printed per run and summarised at the end.
+
+    python benchmarks/startup_benchmark.py --runs 10 --path /login
+    TEMPLATE_CACHE_DIR=/tmp/parking-templates python benchmarks/startup_benchmark.py
+
+With TEMPLATE_CACHE_DIR set, run `flask --app wsgi compile-templates` first so
+the workers start with a warm template cache.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs inside the worker process. Timings are taken from the first line of the script,
+# so interpreter start-up is only included in the wall-clock total measured by the parent.
+WORKER_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from wsgi import app
+loaded = time.perf_counter()
+response = app.test_client().get(sys.argv[1])
+done = time.perf_counter()
+print(json.dumps({'status': response.status_code, 'import_ms': (loaded - start) * 1000, 'first_request_ms': (done - loaded) * 1000}))
+"""
+
+
+def run_worker(path):
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, '-c', WORKER_SCRIPT, path],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result['total_ms'] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--path', default='/login', help='URL requested as the first request')
+    args = parser.parse_args()
+
+    print(f"TEMPLATE_CACHE_DIR={os.environ.get('TEMPLATE_CACHE_DIR', '(not set)')}")
+    results = []
+    for i in range(1, args.runs + 1):
+        result = run_worker(args.path)
+        results.append(result)
+        print(f"run {i:2d}: status {result['status']}  import+create_app {result['import_ms']:7.1f} ms  "
+              f"first request {result['first_request_ms']:7.1f} ms  process total {result['total_ms']:7.1f} ms")
+
+    print()
+    for key, label in [('import_ms', 'import+create_app'), ('first_request_ms', 'first request'), ('total_ms', 'process total')]:
+        values = [r[key] for r in results]
+        print(f"{label:18s} median {statistics.median(values):7.1f} ms  min {min(values):7.1f} ms  max {max(values):7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -13,6 +13,14 @@ def create_app():
     app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(app.instance_path, 'site.db')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+    # Workers can share compiled templates through a bytecode cache directory,
+    # so a new worker does not have to re-parse every template on first use.
+    template_cache_dir = os.environ.get('TEMPLATE_CACHE_DIR')
+    if template_cache_dir:
+        from jinja2 import FileSystemBytecodeCache
+        os.makedirs(template_cache_dir, exist_ok=True)
+        app.jinja_options = {**app.jinja_options, 'bytecode_cache': FileSystemBytecodeCache(template_cache_dir)}
+
     # Now we initialize the extensions with the app instance.
     db.init_app(app)
     login_manager.init_app(app)
@@ -26,6 +34,14 @@ def create_app():
     from .routes import main as main_blueprint
     app.register_blueprint(main_blueprint)
 
+    # Spot status changes are appended to the SpotEvent log in batches.
+    from .events import spot_event_log
+    spot_event_log.init_app(app)
+
+    # Database setup and template compilation are separate CLI commands.
+    from .commands import register_commands
+    register_commands(app)
+
     # The user loader function is defined here because it needs access to both
     # the login_manager and the User/Admin models.
     @login_manager.user_loader
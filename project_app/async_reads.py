@@ -0,0 +1,234 @@
+import asyncio
+import io
+from a2wsgi import WSGIMiddleware
+from a2wsgi.wsgi import build_environ
+from flask import g, render_template
+from sqlalchemy import select, func, case
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from werkzeug.exceptions import HTTPException
+from .models import User, Admin, ParkingLot, ParkingSpot, Reservation
+from .routes import reservation_history_row
+
+# ASGI serving mode. GET requests for the read-heavy pages are served natively on the
+# event loop: the session cookie is read, the user and the page data are loaded through
+# an async SQLAlchemy engine, and only the template rendering is handed to a thread.
+# Every other request goes to the Flask app unchanged, and so does any read request the
+# native path does not fully handle (logged out users, the wrong role, remember-me logins),
+# so redirects and flash messages stay exactly as in the sync views.
+
+
+def to_asgi(app, workers=10, max_native_reads=10):
+    return AsyncReadRouter(app, workers, max_native_reads)
+
+
+class AsyncReadRouter:
+
+    def __init__(self, app, workers, max_native_reads):
+        self.app = app
+        self.wsgi_app = WSGIMiddleware(app, workers=workers)
+        # sqlite:///... becomes sqlite+aiosqlite:///... unless an async URI is configured.
+        database_uri = app.config.get('SQLALCHEMY_ASYNC_DATABASE_URI') or app.config['SQLALCHEMY_DATABASE_URI'].replace('sqlite://', 'sqlite+aiosqlite://', 1)
+        # Pooled connections stay bound to the server's event loop, which runs every native read.
+        self.engine = create_async_engine(database_uri)
+        self.url_adapter = app.url_map.bind('localhost')
+        # Bounds the native reads in flight. Without it every waiting request starts its query
+        # at once, and event loop work competes with the render threads, which stretches tail latency.
+        self.native_reads = asyncio.Semaphore(max_native_reads)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+
+        if scope['type'] == 'http' and scope['method'] == 'GET':
+            page = self.match_read_page(scope['path'])
+            if page is not None:
+                response = await self.serve_read_page(scope, page)
+                if response is not None:
+                    await self.send_response(response, send)
+                    return
+
+        await self.wsgi_app(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def match_read_page(self, path):
+        try:
+            endpoint, _ = self.url_adapter.match(path, method='GET')
+        except HTTPException:
+            return None
+        return READ_PAGES.get(endpoint)
+
+    async def serve_read_page(self, scope, page):
+        async with self.native_reads:
+            return await self.serve_read_page_now(scope, page)
+
+    async def serve_read_page_now(self, scope, page):
+        role, load_page = page
+        environ = build_environ(scope, io.BytesIO())
+
+        # Flask-Login keeps "user_<id>" or "admin_<id>" in the signed session cookie.
+        session = self.app.session_interface.open_session(self.app, self.app.request_class(environ))
+        user_id = session.get('_user_id') if session else None
+        if not user_id or self.app.login_manager.session_protection == 'strong':
+            return None
+
+        async with AsyncSession(self.engine, expire_on_commit=False) as db_session:
+            user = await load_user(db_session, user_id)
+            if not isinstance(user, role):
+                return None
+            template, context = await load_page(db_session, user)
+
+        # Rendering shares the bounded a2wsgi thread pool with the Flask requests.
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.wsgi_app.executor, self.render, environ, user, template, context)
+
+    def render(self, environ, user, template, context):
+        # Runs in a thread with a normal Flask request context, so url_for(), current_user
+        # and flashed messages in the templates behave as in the sync views.
+        with self.app.request_context(environ):
+            g._login_user = user
+            response = self.app.make_response(render_template(template, **context))
+            return self.app.process_response(response)
+
+    async def send_response(self, response, send):
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in response.headers.items()]
+        })
+        await send({'type': 'http.response.body', 'body': response.get_data()})
+
+
+async def load_user(db_session, user_id_str):
+    # Same rules as the load_user callback in create_app().
+    if '_' not in user_id_str:
+        return None
+    user_type, user_id = user_id_str.split('_', 1)
+    try:
+        user_id = int(user_id)
+    except ValueError:
+        return None
+
+    if user_type == 'user':
+        return await db_session.get(User, user_id)
+    elif user_type == 'admin':
+        return await db_session.get(Admin, user_id)
+    return None
+
+
+def count_status(status):
+    return func.coalesce(func.sum(case((ParkingSpot.status == status, 1), else_=0)), 0)
+
+
+async def user_view_parking_lots(db_session, user):
+    result = await db_session.execute(
+        select(ParkingLot, func.count(ParkingSpot.id), count_status('available'))
+        .outerjoin(ParkingSpot, ParkingSpot.lot_id == ParkingLot.id)
+        .group_by(ParkingLot.id)
+        .order_by(ParkingLot.id)
+    )
+
+    parking_lot_data = []
+    for lot, total_spots_created, available_spots_count in result.all():
+        parking_lot_data.append({
+            'lot_id': lot.id,
+            'prime_location_name': lot.prime_location_name,
+            'address': lot.address,
+            'pin_code': lot.pin_code,
+            'price_per_unit_time': lot.price_per_unit_time,
+            'total_capacity': lot.maximum_number_of_spots,
+            'total_spots_created': total_spots_created,
+            'available_spots': available_spots_count
+        })
+
+    return 'user_view_parking_lots.html', {'parking_lot_data': parking_lot_data}
+
+
+async def user_parking_history(db_session, user):
+    result = await db_session.execute(
+        select(Reservation, ParkingSpot.spot_number, ParkingLot.prime_location_name)
+        .outerjoin(ParkingSpot, Reservation.spot_id == ParkingSpot.id)
+        .outerjoin(ParkingLot, ParkingSpot.lot_id == ParkingLot.id)
+        .where(Reservation.user_id == user.id)
+        .order_by(Reservation.parking_timestamp.desc())
+    )
+
+    history_data = []
+    for res, spot_number, lot_name in result.all():
+        if spot_number is None:
+            lot_name = 'N/A'
+            spot_number = 'N/A'
+        history_data.append(reservation_history_row(res, lot_name, spot_number))
+
+    return 'user_parking_history.html', {'history_data': history_data}
+
+
+async def admin_all_reservations(db_session, user):
+    result = await db_session.execute(
+        select(Reservation, ParkingSpot.spot_number, ParkingLot.prime_location_name, User.email_id)
+        .outerjoin(ParkingSpot, Reservation.spot_id == ParkingSpot.id)
+        .outerjoin(ParkingLot, ParkingSpot.lot_id == ParkingLot.id)
+        .outerjoin(User, Reservation.user_id == User.id)
+        .order_by(Reservation.parking_timestamp.desc())
+    )
+
+    all_reservations_data = []
+    for res, spot_number, lot_name, user_email in result.all():
+        if spot_number is None:
+            lot_name = 'N/A'
+            spot_number = 'N/A'
+        row = reservation_history_row(res, lot_name, spot_number, for_admin=True)
+        row['user_email'] = user_email if user_email else 'N/A'
+        all_reservations_data.append(row)
+
+    return 'admin_all_reservations.html', {'all_reservations_data': all_reservations_data}
+
+
+async def admin_dashboard(db_session, user):
+    result = await db_session.execute(
+        select(
+            ParkingLot,
+            func.count(ParkingSpot.id),
+            count_status('occupied'),
+            count_status('available'),
+            count_status('reserved')
+        )
+        .outerjoin(ParkingSpot, ParkingSpot.lot_id == ParkingLot.id)
+        .group_by(ParkingLot.id)
+        .order_by(ParkingLot.id)
+    )
+
+    lot_summaries = []
+    for lot, total_spots_created, occupied_spots, available_spots, reserved_spots in result.all():
+        lot_summaries.append({
+            'lot_id': lot.id,
+            'prime_location_name': lot.prime_location_name,
+            'address': lot.address,
+            'maximum_number_of_spots': lot.maximum_number_of_spots,
+            'total_spots_created': total_spots_created,
+            'occupied_spots': occupied_spots,
+            'available_spots': available_spots,
+            'reserved_spots': reserved_spots,
+            'price_per_unit_time': lot.price_per_unit_time,
+            'pin_code': lot.pin_code
+        })
+
+    return 'admin_dashboard.html', {'lot_summaries': lot_summaries}
+
+
+# Endpoint -> (role allowed on the native path, async page loader).
+READ_PAGES = {
+    'main.user_view_parking_lots': (User, user_view_parking_lots),
+    'main.user_parking_history': (User, user_parking_history),
+    'main.admin_all_reservations': (Admin, admin_all_reservations),
+    'main.admin_dashboard': (Admin, admin_dashboard),
+}
@@ -0,0 +1,63 @@
+import os
+import click
+from .models import db, Admin
+from .events import record_spot_baseline, verify_spot_events
+
+
+def create_db_and_seed_admin():
+    # db.drop_all() # Comment this out to preserve data
+    db.create_all()
+    print("Database tables created.")
+
+    if not Admin.query.filter_by(email_id='admin@gmail.com').first():
+        admin_user = Admin(
+            email_id='admin@gmail.com',
+            fullname='System Administrator',
+            address='Admin HQ',
+            pin_code='110001'
+        )
+        admin_user.set_password('admin')
+        db.session.add(admin_user)
+        db.session.commit()
+        print("Predefined admin user created: admin@gmail.com / admin")
+    else:
+        print("Admin user already exists.")
+
+
+def register_commands(app):
+    # One-shot setup commands, run once per deployment instead of on every worker start.
+
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create the database tables and seed the admin user."""
+        os.makedirs(app.instance_path, exist_ok=True)
+        create_db_and_seed_admin()
+
+        print(f"Recorded {record_spot_baseline()} existing spots in the spot event log.")
+
+    @app.cli.command('compile-templates')
+    def compile_templates_command():
+        """Compile every template into the TEMPLATE_CACHE_DIR bytecode cache."""
+        if app.jinja_env.bytecode_cache is None:
+            raise click.ClickException('Set TEMPLATE_CACHE_DIR to compile templates into a shared cache.')
+
+        template_names = app.jinja_env.list_templates()
+        for name in template_names:
+            app.jinja_env.get_template(name)
+        print(f"Compiled {len(template_names)} templates.")
+
+    @app.cli.command('verify-spot-events')
+    def verify_spot_events_command():
+        """Replay the spot event log and compare it with the current spots.
+
+        Running workers keep up to SPOT_EVENT_FLUSH_INTERVAL seconds of events in
+        memory, and this command cannot see them. On a live deployment, spots changed
+        within that window can show up as mismatches; run it again after the interval,
+        or with the workers stopped, before treating a mismatch as real.
+        """
+        problems = verify_spot_events()
+        for problem in problems:
+            print(problem)
+        if problems:
+            raise click.ClickException(f'{len(problems)} spots do not match the event log.')
+        print("Spot event log matches the current spots.")
@@ -0,0 +1,175 @@
+import atexit
+import threading
+from datetime import datetime
+from flask import has_request_context, session
+from .models import db, ParkingSpot, SpotEvent
+
+# Status recorded when a spot is removed together with (or from) its parking lot.
+DELETED = 'deleted'
+
+
+class SpotEventLog:
+    # Buffers spot status changes in memory and appends them to the SpotEvent table
+    # in batches from a background thread, so request handlers never wait on the log.
+    # Events still in the buffer are lost if the process is killed before a flush.
+
+    def __init__(self, app=None):
+        self.app = None
+        self._buffer = []
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._failed_flushes = 0
+        atexit.register(self._flush_at_exit)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        # One log serves one app per process, because the buffer and the flusher thread
+        # are shared and every buffered event is written through self.app's engine.
+        if self.app is not None and self.app is not app:
+            raise RuntimeError('The spot event log is already initialised with another app.')
+        app.config.setdefault('SPOT_EVENT_BATCH_SIZE', 100)
+        app.config.setdefault('SPOT_EVENT_FLUSH_INTERVAL', 2.0)
+        app.config.setdefault('SPOT_EVENT_MAX_FAILED_FLUSHES', 5)
+        app.config.setdefault('SPOT_EVENT_MAX_BUFFER', 10000)
+        self.app = app
+
+    def record(self, spot_id, lot_id, spot_number, old_status, new_status, actor=None):
+        # Call this only after the change has been committed, so a rolled back
+        # change never shows up in the log. The actor comes from the id Flask-Login keeps
+        # in the session, because reading current_user after a commit would reload it.
+        if actor is None and has_request_context():
+            actor = session.get('_user_id')
+
+        event = {
+            'spot_id': spot_id,
+            'lot_id': lot_id,
+            'spot_number': spot_number,
+            'old_status': old_status,
+            'new_status': new_status,
+            'actor': actor,
+            'timestamp': datetime.now()
+        }
+        with self._buffer_lock:
+            self._buffer.append(event)
+            pending = len(self._buffer)
+
+        self._start_flusher()
+        # While writes are failing, retry on the flush interval instead of on every new event.
+        if pending >= self.app.config['SPOT_EVENT_BATCH_SIZE'] and not self._failed_flushes:
+            self._wake.set()
+
+    def flush(self):
+        # Writes every buffered event in a single transaction, separate from db.session.
+        if self.app is None:
+            return 0
+
+        with self._flush_lock:
+            with self._buffer_lock:
+                events, self._buffer = self._buffer, []
+            if not events:
+                return 0
+
+            try:
+                with self.app.app_context():
+                    with db.engine.begin() as connection:
+                        connection.execute(SpotEvent.__table__.insert(), events)
+            except Exception as e:
+                self._failed_flushes += 1
+                failed_flushes = self._failed_flushes
+                with self._buffer_lock:
+                    pending = len(events) + len(self._buffer)
+                    if (failed_flushes < self.app.config['SPOT_EVENT_MAX_FAILED_FLUSHES']
+                            and pending <= self.app.config['SPOT_EVENT_MAX_BUFFER']):
+                        # Put the batch back in front so events stay in order for the next flush.
+                        self._buffer[:0] = events
+                        raise
+                    # Give up instead of keeping every event in memory while the database is unusable.
+                    self._buffer = []
+                    self._failed_flushes = 0
+                self.app.logger.error(f'Dropped {pending} spot events after {failed_flushes} failed writes: {e}')
+                raise
+            self._failed_flushes = 0
+            return len(events)
+
+    def _flush_at_exit(self):
+        try:
+            self.flush()
+        except Exception as e:
+            self.app.logger.error(f'Could not write spot events at exit: {e}')
+
+    def _start_flusher(self):
+        # Started lazily so each worker process gets its own thread after forking.
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._buffer_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='spot-event-flusher', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.app.config['SPOT_EVENT_FLUSH_INTERVAL'])
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                self.app.logger.error(f'Could not write spot events: {e}')
+
+
+spot_event_log = SpotEventLog()
+
+
+def record_spot_baseline():
+    # Spots that existed before the event log get one event with their current status,
+    # so that replaying the log starts from them.
+    logged_spot_ids = db.session.query(SpotEvent.spot_id).distinct()
+    missing_spots = db.session.query(
+        ParkingSpot.id, ParkingSpot.lot_id, ParkingSpot.spot_number, ParkingSpot.status
+    ).filter(ParkingSpot.id.notin_(logged_spot_ids)).order_by(ParkingSpot.id.asc()).all()
+
+    for spot_id, lot_id, spot_number, status in missing_spots:
+        spot_event_log.record(spot_id, lot_id, spot_number, None, status, actor='system')
+    spot_event_log.flush()
+    return len(missing_spots)
+
+
+def replay_spot_events():
+    # Rebuilds the current state of every spot from the event log alone.
+    spots = {}
+    events = SpotEvent.query.order_by(SpotEvent.timestamp.asc(), SpotEvent.id.asc()).all()
+    for event in events:
+        if event.new_status == DELETED:
+            spots.pop(event.spot_id, None)
+        else:
+            spots[event.spot_id] = {
+                'lot_id': event.lot_id,
+                'spot_number': event.spot_number,
+                'status': event.new_status
+            }
+    return spots
+
+
+def verify_spot_events():
+    # Compares the replayed event log with the ParkingSpot table and describes every difference.
+    # Only flushed events are seen, so spots changed within the last flush interval by another
+    # process can be reported until that process flushes its buffer.
+    replayed = replay_spot_events()
+    problems = []
+
+    for spot_id, lot_id, spot_number, status in db.session.query(
+        ParkingSpot.id, ParkingSpot.lot_id, ParkingSpot.spot_number, ParkingSpot.status
+    ).order_by(ParkingSpot.id.asc()):
+        expected = replayed.pop(spot_id, None)
+        if expected is None:
+            problems.append(f'Spot {spot_id} (lot {lot_id}, number {spot_number}) has no events.')
+        elif (expected['lot_id'], expected['spot_number'], expected['status']) != (lot_id, spot_number, status):
+            problems.append(f"Spot {spot_id} is {status} in lot {lot_id} number {spot_number}, "
+                            f"but the log says {expected['status']} in lot {expected['lot_id']} number {expected['spot_number']}.")
+
+    for spot_id, expected in replayed.items():
+        problems.append(f"Spot {spot_id} (lot {expected['lot_id']}, number {expected['spot_number']}) is in the log but no longer exists.")
+
+    return problems
@@ -1,4 +1,3 @@
-from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
@@ -83,4 +82,19 @@ class Reservation(db.Model):
     parking_cost_per_unit_time = db.Column(db.Float, nullable=False)
 
     def __repr__(self):
-        return f"Reservation(User: {self.user_id}, Spot: {self.spot_id}, Start: {self.parking_timestamp.strftime('%Y-%m-%d %H:%M')}, End: {self.leaving_timestamp.strftime('%Y-%m-%d %H:%M') if self.leaving_timestamp else 'N/A'})"
\ No newline at end of file
+        return f"Reservation(User: {self.user_id}, Spot: {self.spot_id}, Start: {self.parking_timestamp.strftime('%Y-%m-%d %H:%M')}, End: {self.leaving_timestamp.strftime('%Y-%m-%d %H:%M') if self.leaving_timestamp else 'N/A'})"
+
+class SpotEvent(db.Model):
+    # Append-only log of spot status changes, written in batches by SpotEventLog.
+    # spot_id is not a foreign key so events survive the deletion of their spot.
+    id = db.Column(db.Integer, primary_key=True)
+    spot_id = db.Column(db.Integer, nullable=False, index=True)
+    lot_id = db.Column(db.Integer, nullable=False)
+    spot_number = db.Column(db.Integer, nullable=False)
+    old_status = db.Column(db.String(20), nullable=True)
+    new_status = db.Column(db.String(20), nullable=False)
+    actor = db.Column(db.String(40), nullable=True)
+    timestamp = db.Column(db.DateTime, nullable=False, default=datetime.now)
+
+    def __repr__(self):
+        return f"SpotEvent(Spot: {self.spot_id}, {self.old_status} -> {self.new_status}, By: {self.actor}, At: {self.timestamp.strftime('%Y-%m-%d %H:%M:%S')})"
@@ -1,8 +1,8 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
 from flask_login import login_user, current_user, logout_user, login_required
-from werkzeug.security import generate_password_hash, check_password_hash
 from .models import db, User, Admin, ParkingLot, ParkingSpot, Reservation
-from datetime import datetime, timezone, timedelta
+from .events import spot_event_log, DELETED
+from datetime import datetime
 
 # Create a Blueprint to organize routes
 main = Blueprint('main', __name__)
@@ -177,9 +177,12 @@ def reserve_spot(lot_id):
                 parking_cost_per_unit_time=parking_lot.price_per_unit_time
             )
             db.session.add(new_reservation)
+            # Read before the commit expires the spot, so logging it needs no extra query.
+            reserved_spot_id, reserved_spot_number = available_spot.id, available_spot.spot_number
             db.session.commit()
+            spot_event_log.record(reserved_spot_id, lot_id, reserved_spot_number, 'available', 'reserved')
 
-            flash(f'Spot {available_spot.spot_number} in {parking_lot.prime_location_name} has been reserved for you!','success')
+            flash(f'Spot {reserved_spot_number} in {parking_lot.prime_location_name} has been reserved for you!','success')
         except Exception as e:
             db.session.rollback()
             flash(f'An error occured during reservation: {e}','danger')
@@ -209,7 +212,9 @@ def occupy_spot(spot_id):
 
             if current_reservation:
                 current_reservation.parking_timestamp=datetime.now()
+                spot_lot_id, spot_number = spot.lot_id, spot.spot_number
                 db.session.commit()
+                spot_event_log.record(spot_id, spot_lot_id, spot_number, 'reserved', 'occupied')
                 flash(f'Spot {spot.spot_number} in {spot.parking_lot.prime_location_name} is now occupied','success')
             else:
                 flash('Error: No active reservation found for this spot.','danger')
@@ -245,7 +250,9 @@ def release_spot(spot_id):
 
             if current_reservation:
                 current_reservation.leaving_timestamp=datetime.now()
+                spot_lot_id, spot_number = spot.lot_id, spot.spot_number
                 db.session.commit()
+                spot_event_log.record(spot_id, spot_lot_id, spot_number, 'occupied', 'available')
                 flash(f'Spot {spot.spot_number} in {spot.parking_lot.prime_location_name} has been released.','success')
             else:
                 flash('Error: No active reservation found to release for this spot.','danger')
@@ -257,6 +264,51 @@ def release_spot(spot_id):
         flash(f'Spot {spot.spot_number} cannot be released. It is not occupied by you.','warning')
     return redirect(url_for('main.user_dashboard'))
 
+def reservation_history_row(res, lot_name, spot_number, for_admin=False):
+    # Builds the row shown for a reservation on the history pages.
+    duration_str = 'N/A'
+    total_cost = 'N/A'
+
+    if res.leaving_timestamp:
+        duration_str, total_cost = reservation_duration_and_cost(res, for_admin)
+
+    return {
+        'reservation_id': res.id,
+        'lot_name': lot_name,
+        'spot_number': spot_number,
+        'parking_timestamp': res.parking_timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+        'leaving_timestamp': res.leaving_timestamp.strftime('%Y-%m-%d %H:%M:%S') if res.leaving_timestamp else 'Current',
+        'duration': duration_str,
+        'cost_per_unit_time': f"₹{res.parking_cost_per_unit_time:.2f} / minute",
+        'total_cost': total_cost
+    }
+
+def reservation_duration_and_cost(res, for_admin=False):
+    # Returns the display strings for how long a finished reservation lasted and what it cost.
+    # The admin page prices the exact duration and ends "Less than a minute." with a period,
+    # while the user history prices whole seconds only.
+    duration = res.leaving_timestamp - res.parking_timestamp
+    total_seconds = int(duration.total_seconds())
+
+    total_minutes = (duration.total_seconds() if for_admin else total_seconds) / 60.0
+    total_cost_value = total_minutes * res.parking_cost_per_unit_time
+    total_cost = f"₹{total_cost_value:.2f}"
+
+    hours = total_seconds // 3600
+    minutes = (total_seconds % 3600) // 60
+    seconds = total_seconds % 60
+
+    duration_parts = []
+    if hours > 0:
+        duration_parts.append(f"{hours} hour{'s' if hours > 1 else ''}")
+    if minutes > 0:
+        duration_parts.append(f"{minutes} minute{'s' if minutes > 1 else ''}")
+    if seconds > 0:
+        duration_parts.append(f"{seconds} second{'s' if seconds > 1 else ''}")
+
+    duration_str = ", ".join(duration_parts) if duration_parts else ("Less than a minute." if for_admin else "Less than a minute")
+    return duration_str, total_cost
+
 @main.route('/user/parking_history')
 @login_required
 def user_parking_history():
@@ -275,40 +327,7 @@ def user_parking_history():
             lot_name=spot.parking_lot.prime_location_name
             spot_number=spot.spot_number
 
-        duration_str = 'N/A'
-        total_cost = 'N/A'
-
-        if res.leaving_timestamp:
-            duration=res.leaving_timestamp - res.parking_timestamp
-            total_seconds=int(duration.total_seconds())
-            total_minutes = total_seconds / 60.0 
-            total_cost_value = total_minutes * res.parking_cost_per_unit_time 
-            total_cost = f"₹{total_cost_value:.2f}" 
-
-            hours=total_seconds//3600
-            minutes=(total_seconds % 3600) // 60
-            seconds=total_seconds % 60
-            
-            duration_parts = []
-            if hours > 0:
-                duration_parts.append(f"{hours} hour{'s' if hours > 1 else ''}")
-            if minutes > 0:
-                duration_parts.append(f"{minutes} minute{'s' if minutes > 1 else ''}")
-            if seconds > 0 and (not hours and not minutes or (hours > 0 or minutes > 0)):
-                duration_parts.append(f"{seconds} second{'s' if seconds > 1 else ''}")
-            
-            duration_str = ", ".join(duration_parts) if duration_parts else "Less than a minute"
-            
-        history_data.append({
-            'reservation_id': res.id,
-            'lot_name': lot_name,
-            'spot_number': spot_number,
-            'parking_timestamp': res.parking_timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-            'leaving_timestamp': res.leaving_timestamp.strftime('%Y-%m-%d %H:%M:%S') if res.leaving_timestamp else 'Current',
-            'duration': duration_str,
-            'cost_per_unit_time': f"₹{res.parking_cost_per_unit_time:.2f} / minute",
-            'total_cost': total_cost
-        })
+        history_data.append(reservation_history_row(res, lot_name, spot_number))
 
     return render_template('user_parking_history.html', history_data=history_data)
 
@@ -337,43 +356,9 @@ def admin_all_reservations():
         if user:
             user_email = user.email_id
 
-        duration_str = 'N/A'
-        total_cost = 'N/A'
-
-        if res.leaving_timestamp:
-            duration = res.leaving_timestamp - res.parking_timestamp 
-            total_seconds = int(duration.total_seconds())
-            
-            total_minutes = duration.total_seconds() / 60.0
-            total_cost_value = total_minutes * res.parking_cost_per_unit_time
-            total_cost = f"₹{total_cost_value:.2f}"
-
-            hours = total_seconds // 3600
-            minutes = (total_seconds % 3600) // 60
-            seconds = total_seconds % 60
-
-            duration_parts = []
-
-            if hours > 0:
-                duration_parts.append(f"{hours} hour{'s' if hours > 1 else ''}")
-            if minutes > 0:
-                duration_parts.append(f"{minutes} minute{'s' if minutes > 1 else ''}")
-            if seconds > 0 and (not hours and not minutes or (hours > 0 or minutes > 0)):
-                duration_parts.append(f"{seconds} second{'s' if seconds > 1 else ''}")
-             
-            duration_str = ", ".join(duration_parts) if duration_parts else "Less than a minute." 
-            
-        all_reservations_data.append({
-            'reservation_id': res.id,
-            'user_email': user_email,
-            'lot_name': lot_name,
-            'spot_number': spot_number,
-            'parking_timestamp': res.parking_timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-            'leaving_timestamp': res.leaving_timestamp.strftime('%Y-%m-%d %H:%M:%S') if res.leaving_timestamp else 'Current',
-            'duration': duration_str,
-            'cost_per_unit_time': f"₹{res.parking_cost_per_unit_time:.2f} / minute",
-            'total_cost': total_cost
-        })
+        row = reservation_history_row(res, lot_name, spot_number, for_admin=True)
+        row['user_email'] = user_email
+        all_reservations_data.append(row)
     
     return render_template('admin_all_reservations.html', all_reservations_data=all_reservations_data)
     
@@ -455,10 +440,17 @@ def create_parking_lot():
             db.session.commit()
 
             #Creating Spots
+            new_spots = []
             for i in range(1,maximum_no_of_spots+1):
                 spot = ParkingSpot(lot_id=parking_lot.id,spot_number=i,status='available')
                 db.session.add(spot)
+                new_spots.append(spot)
+            db.session.flush()
+            created_spots = [(spot.id, spot.lot_id, spot.spot_number) for spot in new_spots]
             db.session.commit()
+
+            for spot_id, spot_lot_id, spot_number in created_spots:
+                spot_event_log.record(spot_id, spot_lot_id, spot_number, None, 'available')
             flash('Parking lot created successfully!', 'success')
             return redirect(url_for('main.admin_dashboard'))
         except Exception as e:
@@ -494,10 +486,13 @@ def edit_parking_lot(lot_id):
             db.session.commit()
 
             new_max_spots = parking_lot.maximum_number_of_spots
+            new_spots = []
+            deleted_spots = []
             if new_max_spots > original_max_spots:
                 for i in range(original_max_spots + 1, new_max_spots + 1):
                     spot = ParkingSpot(lot_id=parking_lot.id, spot_number=i, status='available')
                     db.session.add(spot)
+                    new_spots.append(spot)
                 flash(f'Added {new_max_spots - original_max_spots} new parking spots','info')
             elif new_max_spots < original_max_spots:
                 spots_to_delete = ParkingSpot.query.filter_by(lot_id=parking_lot.id).filter(ParkingSpot.spot_number>new_max_spots).all()
@@ -505,11 +500,19 @@ def edit_parking_lot(lot_id):
                 for spot in spots_to_delete:
                     if spot.status in ['occupied','reserved']:
                         flash(f'Warning: Spot {spot.spot_number} was {spot.status} and will be deleted. Ensure no active reservations/occupancies on deleted spots.','warning')
+                    deleted_spots.append((spot.id, spot.spot_number, spot.status))
                     db.session.delete(spot)
                 flash(f'Removed {original_max_spots - new_max_spots} parking spots.','info')
             
+            db.session.flush()
+            created_spots = [(spot.id, spot.spot_number) for spot in new_spots]
             db.session.commit()
 
+            for spot_id, spot_number in created_spots:
+                spot_event_log.record(spot_id, lot_id, spot_number, None, 'available')
+            for spot_id, spot_number, status in deleted_spots:
+                spot_event_log.record(spot_id, lot_id, spot_number, status, DELETED)
+
             flash('Parking lot updated successfully!','success')
             return redirect(url_for('main.admin_dashboard'))
         except Exception as e:
@@ -527,8 +530,11 @@ def delete_parking_lot(lot_id):
     parking_lot = ParkingLot.query.get_or_404(lot_id)
 
     try:
+        deleted_spots = [(spot.id, spot.spot_number, spot.status) for spot in parking_lot.spots]
         db.session.delete(parking_lot)
         db.session.commit()
+        for spot_id, spot_number, status in deleted_spots:
+            spot_event_log.record(spot_id, lot_id, spot_number, status, DELETED)
         flash(f'Parking lot "{parking_lot.prime_location_name}" and all its spots and reservations have been deleted successfully','success')
     except Exception as e:
         db.session.rollback()
@@ -537,6 +543,61 @@ def delete_parking_lot(lot_id):
     # Ensure a redirect happens even if an exception occurs
     return redirect(url_for('main.admin_dashboard'))
 
+# Number of spots sent per grid section. Large lots are rendered one section at a time.
+SPOT_GRID_SECTION_SIZE = 250
+
+def get_spot_grid_section(parking_lot, section):
+    # Spot numbers in a lot always run 1..maximum_number_of_spots (see create/edit lot),
+    # so a section is a spot_number range and needs no OFFSET or COUNT query.
+    total_sections = max(1, -(-parking_lot.maximum_number_of_spots // SPOT_GRID_SECTION_SIZE))
+    section = min(max(section, 1), total_sections)
+    first_spot = (section - 1) * SPOT_GRID_SECTION_SIZE + 1
+    last_spot = min(section * SPOT_GRID_SECTION_SIZE, parking_lot.maximum_number_of_spots)
+
+    # One query for the whole section: emails come from an outer join instead of
+    # lazily loading occupied_by_user for every spot.
+    rows = db.session.query(
+        ParkingSpot.id,
+        ParkingSpot.spot_number,
+        ParkingSpot.status,
+        ParkingSpot.user_id,
+        User.email_id
+    ).outerjoin(User, ParkingSpot.user_id == User.id).filter(
+        ParkingSpot.lot_id == parking_lot.id,
+        ParkingSpot.spot_number >= first_spot,
+        ParkingSpot.spot_number <= last_spot
+    ).order_by(ParkingSpot.spot_number.asc()).all()
+
+    # Statuses are run-length encoded as [status, run_length] pairs. Only spots that
+    # are not available are listed individually.
+    runs = []
+    taken_spots = []
+    for spot_id, spot_number, status, user_id, email in rows:
+        if runs and runs[-1][0] == status:
+            runs[-1][1] += 1
+        else:
+            runs.append([status, 1])
+
+        if status != 'available' or user_id:
+            user_email = 'N/A'
+            if user_id:
+                user_email = email if email else 'User not found'
+            taken_spots.append({
+                'spot_id': spot_id,
+                'spot_number': spot_number,
+                'status': status,
+                'occupied_by': user_email
+            })
+
+    return {
+        'section': section,
+        'total_sections': total_sections,
+        'first_spot_number': rows[0][1] if rows else first_spot,
+        'spot_count': len(rows),
+        'runs': runs,
+        'taken_spots': taken_spots
+    }
+
 @main.route('/admin/parking_lot/<int:lot_id>/spot')
 @login_required
 def view_parking_spot(lot_id):
@@ -545,27 +606,21 @@ def view_parking_spot(lot_id):
         return redirect(url_for('main.user_dashboard'))
 
     parking_lot = ParkingLot.query.get_or_404(lot_id)
-    parking_spots = ParkingSpot.query.filter_by(lot_id=lot_id).order_by(ParkingSpot.spot_number.asc()).all()
+    first_section = get_spot_grid_section(parking_lot, 1)
 
-    spots_data = []
-    for spot in parking_spots:
-        user_email = "N/A"
-        
-        if spot.user_id:
-            if spot.occupied_by_user:
-                user_email = spot.occupied_by_user.email_id
-            else:
-                user_email = "User not found"
+    return render_template('view_parking_spot.html',
+                           parking_lot=parking_lot,
+                           first_section=first_section)
 
-        spots_data.append({
-            'spot_id': spot.id,
-            'spot_number': spot.spot_number,
-            'status': spot.status,
-            'occupied_by': user_email,
-        })
+@main.route('/admin/parking_lot/<int:lot_id>/spot_grid')
+@login_required
+def parking_spot_grid(lot_id):
+    if not isinstance(current_user, Admin):
+        return jsonify({'error': 'You must be an administrator to access this page.'}), 403
 
-    return render_template('view_parking_spot.html',
-                           parking_lot=parking_lot, 
-                           spots_data=spots_data)
+    parking_lot = ParkingLot.query.get_or_404(lot_id)
+    section = request.args.get('section', 1, type=int)
+
+    return jsonify(get_spot_grid_section(parking_lot, section))
 
 # --- Database Initialization and Admin Seeding ---
\ No newline at end of file
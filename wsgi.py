@@ -0,0 +1,5 @@
+# Production entry point, e.g. `gunicorn wsgi:app`.
+# The database is not touched here; run `flask --app wsgi init-db` once before starting workers.
+from project_app import create_app
+
+app = create_app()